@@ -4,9 +4,17 @@ gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GLib, Gio, Gdk
 import json
+import math
 import os
+import sys
+import copy
+import queue
+import concurrent.futures
 import threading
+import time
 import gettext
+import array
+import functools
 from datetime import datetime
 from collections import deque
 from mqtt_dashboard.accessibility import AccessibilityManager
@@ -17,9 +25,73 @@ try:
 except ImportError:
     HAS_MQTT = False
 
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _json_loads(data):
+        return json.loads(data)
+
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=2).encode()
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from OpenGL import GL
+    from OpenGL.GL import shaders
+    from OpenGL.error import Error as GLError
+    HAS_GL = True
+except ImportError:
+    HAS_GL = False
+# Gtk.GLArea.set_allowed_apis was added in GTK 4.12
+HAS_GL_ALLOWED_APIS = hasattr(Gtk.GLArea, "set_allowed_apis")
+
+# Gtk.Window "suspended" state was added in GTK 4.12
+HAS_SUSPENDED = hasattr(Gtk.Window, "is_suspended")
+
 _ = gettext.gettext
 APP_ID = "io.github.yeager.MqttDashboard"
 CONFIG_FILE = os.path.expanduser("~/.config/mqtt-dashboard/config.json")
+# Maximum outbound MQTT operations handled per worker wakeup
+MQTT_TX_BATCH = 64
+# Message log is trimmed back to LOG_KEEP_LINES once it exceeds LOG_MAX_LINES
+LOG_MAX_LINES = 2000
+LOG_KEEP_LINES = 1500
+# Config saves are debounced by this many milliseconds, then written off-thread
+SAVE_DELAY_MS = 500
+_SAVE_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+# Parsed config keyed by (path, st_mtime_ns, st_size) -> (config, serialized)
+_CONFIG_CACHE = {}
+# Trie key holding the widgets subscribed to the pattern ending at a node
+_TRIE_WIDGETS = None
+# Last formatted wall-clock second, shared by all message handlers
+_last_ts_sec = 0
+_last_ts_str = ""
+
+
+def _now_hms():
+    """Return the current time as HH:MM:SS, formatting at most once a second."""
+    global _last_ts_sec, _last_ts_str
+    t = int(time.time())
+    if t != _last_ts_sec:
+        _last_ts_sec = t
+        _last_ts_str = time.strftime("%H:%M:%S", time.localtime(t))
+    return _last_ts_str
+
+
+@functools.lru_cache(maxsize=4096)
+def _split_topic(topic):
+    return tuple(topic.split("/"))
 
 
 
@@ -43,43 +115,218 @@ def _save_wlc_settings(s):
     with open(_wlc_settings_path(), "w") as f:
         json.dump(s, f, indent=2)
 
-class SparklineWidget(Gtk.DrawingArea):
+class _FrameRedrawMixin:
+    """Coalesce redraw requests into at most one queue_draw per frame."""
+    _redraw_pending = False
+
+    def _schedule_redraw(self):
+        if self._redraw_pending:
+            return
+        self._redraw_pending = True
+        self.add_tick_callback(self._on_redraw_tick)
+
+    def _on_redraw_tick(self, widget, frame_clock):
+        self._redraw_pending = False
+        self.queue_draw()
+        return GLib.SOURCE_REMOVE
+
+
+class _ValueRingMixin:
+    """Fixed-size ring buffer of sparkline samples stored as packed floats."""
+
+    def _init_ring(self, max_points):
+        # head is the next slot to write, count the number of filled slots
+        self.max_points = max_points
+        if HAS_NUMPY:
+            self.values = np.zeros(max_points, dtype=np.float32)
+        else:
+            self.values = array.array('f', [0.0] * max_points)
+        self.head = 0
+        self.count = 0
+
+    def add_value(self, val):
+        if val is None:
+            return
+        self.values[self.head] = val
+        self.head = (self.head + 1) % self.max_points
+        self.count = min(self.count + 1, self.max_points)
+        self._schedule_redraw()
+
+    def _take_ring(self, other):
+        """Adopt the samples already collected by another ring widget."""
+        self.values, self.head, self.count = other.values, other.head, other.count
+
+    def _ordered_values(self):
+        """Return the stored values oldest first."""
+        if self.count < self.max_points:
+            return self.values[:self.count]
+        if HAS_NUMPY:
+            return np.concatenate((self.values[self.head:], self.values[:self.head]))
+        return self.values[self.head:] + self.values[:self.head]
+
+
+class SparklineWidget(_ValueRingMixin, _FrameRedrawMixin, Gtk.DrawingArea):
     """Simple sparkline chart."""
     def __init__(self, max_points=50):
         super().__init__()
-        self.values = deque(maxlen=max_points)
+        self._init_ring(max_points)
         self.set_content_width(200)
         self.set_content_height(60)
         self.set_draw_func(self._draw)
 
-    def add_value(self, val):
-        try:
-            self.values.append(float(val))
-        except (ValueError, TypeError):
-            return
-        self.queue_draw()
-
     def _draw(self, area, cr, width, height):
-        if len(self.values) < 2:
+        n = self.count
+        if n < 2:
             return
-        vals = list(self.values)
-        min_v, max_v = min(vals), max(vals)
-        rng = max_v - min_v if max_v != min_v else 1
-        n = len(vals)
+        vals = self._ordered_values()
+        if HAS_NUMPY:
+            min_v, max_v = vals.min(), vals.max()
+            rng = (max_v - min_v) or 1
+            ys = (height - ((vals - min_v) / rng) * (height - 4) - 2).tolist()
+            xs = np.linspace(0, width, n).tolist()
+        else:
+            min_v, max_v = min(vals), max(vals)
+            rng = max_v - min_v if max_v != min_v else 1
+            ys = [height - ((v - min_v) / rng) * (height - 4) - 2 for v in vals]
+            xs = [i * width / (n - 1) for i in range(n)]
         cr.set_source_rgba(0.2, 0.6, 0.9, 0.8)
         cr.set_line_width(2)
-        for i, v in enumerate(vals):
-            x = i * width / (n - 1)
-            y = height - ((v - min_v) / rng) * (height - 4) - 2
-            if i == 0:
-                cr.move_to(x, y)
-            else:
-                cr.line_to(x, y)
+        cr.move_to(xs[0], ys[0])
+        for x, y in zip(xs[1:], ys[1:]):
+            cr.line_to(x, y)
         cr.stroke()
 
 
-class GaugeWidget(Gtk.DrawingArea):
+# Compiled with "#version 150" and "#define MAX_POINTS <n>" prepended. Each
+# sample expands to two vertices of a triangle strip, offset 1 px either side
+# of the line, so the stroke and the 2 px inset match SparklineWidget._draw.
+_SPARKLINE_VERTEX_SHADER = """
+uniform float values[MAX_POINTS];
+uniform int count;
+uniform float min_v;
+uniform float span;
+uniform vec2 size;
+
+vec2 point(int i) {
+    float x = float(i) * size.x / float(count - 1);
+    float y = (values[i] - min_v) / span * (size.y - 4.0) + 2.0;
+    return vec2(x, y);
+}
+
+void main() {
+    int i = gl_VertexID / 2;
+    float side = (gl_VertexID % 2 == 0) ? -1.0 : 1.0;
+    vec2 dir = normalize(point(min(i + 1, count - 1)) - point(max(i - 1, 0)));
+    vec2 p = point(i) + vec2(-dir.y, dir.x) * side;
+    gl_Position = vec4(p / size * 2.0 - 1.0, 0.0, 1.0);
+}
+"""
+
+_SPARKLINE_FRAGMENT_SHADER = """
+#version 150
+out vec4 color;
+void main() {
+    color = vec4(0.2, 0.6, 0.9, 0.8);
+}
+"""
+
+
+class GLSparklineWidget(_ValueRingMixin, _FrameRedrawMixin, Gtk.GLArea):
+    """Sparkline chart rendered on the GPU as a single triangle strip.
+
+    If no usable GL context or shader is available, on_failure is called
+    from the main loop so the owner can swap in a Cairo SparklineWidget.
+    """
+    def __init__(self, max_points=50, on_failure=None):
+        super().__init__()
+        self._init_ring(max_points)
+        self._program = None
+        self._vao = None
+        self._on_failure = on_failure
+        if HAS_GL_ALLOWED_APIS:
+            self.set_allowed_apis(Gdk.GLAPI.GL)
+        self.set_required_version(3, 2)
+        if hasattr(self, "set_has_alpha"):
+            self.set_has_alpha(True)
+        self.set_size_request(200, 60)
+        self.connect("realize", self._on_realize)
+        self.connect("unrealize", self._on_unrealize)
+        self.connect("render", self._on_render)
+
+    def _on_realize(self, area):
+        self.make_current()
+        if self.get_error() is not None:
+            self._fail()
+            return
+        vertex_src = f"#version 150\n#define MAX_POINTS {self.max_points}\n" + _SPARKLINE_VERTEX_SHADER
+        try:
+            # Core profiles only validate a program while a VAO is bound
+            self._vao = GL.glGenVertexArrays(1)
+            GL.glBindVertexArray(self._vao)
+            self._program = shaders.compileProgram(
+                shaders.compileShader(vertex_src, GL.GL_VERTEX_SHADER),
+                shaders.compileShader(_SPARKLINE_FRAGMENT_SHADER, GL.GL_FRAGMENT_SHADER))
+        except (RuntimeError, GLError):
+            if self._vao is not None:
+                GL.glDeleteVertexArrays(1, [self._vao])
+                self._vao = None
+            self._fail()
+            return
+        finally:
+            GL.glBindVertexArray(0)
+        self._u_values = GL.glGetUniformLocation(self._program, "values")
+        self._u_count = GL.glGetUniformLocation(self._program, "count")
+        self._u_min = GL.glGetUniformLocation(self._program, "min_v")
+        self._u_span = GL.glGetUniformLocation(self._program, "span")
+        self._u_size = GL.glGetUniformLocation(self._program, "size")
+
+    def _fail(self):
+        if self._on_failure is not None:
+            # Not from inside realize: the owner replaces this widget
+            GLib.idle_add(self._on_failure, self)
+
+    def _on_unrealize(self, area):
+        if self._program is None:
+            return
+        self.make_current()
+        GL.glDeleteVertexArrays(1, [self._vao])
+        GL.glDeleteProgram(self._program)
+        self._program = None
+        self._vao = None
+
+    def _on_render(self, area, context):
+        GL.glClearColor(0, 0, 0, 0)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+        n = self.count
+        if self._program is None or n < 2:
+            return True
+        vals = self._ordered_values()
+        if HAS_NUMPY:
+            min_v, max_v = float(vals.min()), float(vals.max())
+        else:
+            min_v, max_v = min(vals), max(vals)
+            vals = vals.tolist()
+        GL.glEnable(GL.GL_BLEND)
+        GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
+        GL.glUseProgram(self._program)
+        GL.glUniform1fv(self._u_values, n, vals)
+        GL.glUniform1i(self._u_count, n)
+        GL.glUniform1f(self._u_min, min_v)
+        GL.glUniform1f(self._u_span, (max_v - min_v) or 1)
+        # Logical pixels, the same units SparklineWidget draws in
+        GL.glUniform2f(self._u_size, self.get_width(), self.get_height())
+        GL.glBindVertexArray(self._vao)
+        GL.glDrawArrays(GL.GL_TRIANGLE_STRIP, 0, 2 * n)
+        GL.glBindVertexArray(0)
+        GL.glUseProgram(0)
+        return True
+
+
+class GaugeWidget(_FrameRedrawMixin, Gtk.DrawingArea):
     """Simple gauge 0-100."""
+    _PI = math.pi
+    _TWO_PI = 2 * math.pi
+
     def __init__(self):
         super().__init__()
         self.value = 0
@@ -88,26 +335,24 @@ class GaugeWidget(Gtk.DrawingArea):
         self.set_draw_func(self._draw)
 
     def set_value(self, val):
-        try:
-            self.value = max(0, min(100, float(val)))
-        except (ValueError, TypeError):
+        if val is None:
             return
-        self.queue_draw()
+        self.value = max(0, min(100, val))
+        self._schedule_redraw()
 
     def _draw(self, area, cr, width, height):
-        import math
         cx, cy = width / 2, height - 5
         r = min(cx, cy) - 5
         # Background arc
         cr.set_source_rgba(0.5, 0.5, 0.5, 0.3)
         cr.set_line_width(8)
-        cr.arc(cx, cy, r, math.pi, 2 * math.pi)
+        cr.arc(cx, cy, r, self._PI, self._TWO_PI)
         cr.stroke()
         # Value arc
         cr.set_source_rgba(0.2, 0.7, 0.3, 0.9)
         cr.set_line_width(8)
-        angle = math.pi + (self.value / 100) * math.pi
-        cr.arc(cx, cy, r, math.pi, angle)
+        angle = self._PI + (self.value / 100) * self._PI
+        cr.arc(cx, cy, r, self._PI, angle)
         cr.stroke()
         # Text
         cr.set_source_rgba(0.9, 0.9, 0.9, 1)
@@ -141,7 +386,10 @@ class TopicWidget(Gtk.Box):
             self.value_label = Gtk.Label(label="--", css_classes=["monospace"])
             inner.append(self.value_label)
         elif widget_type == "sparkline":
-            self.sparkline = SparklineWidget()
+            if HAS_GL:
+                self.sparkline = GLSparklineWidget(on_failure=self._use_cairo_sparkline)
+            else:
+                self.sparkline = SparklineWidget()
             inner.append(self.sparkline)
             self.value_label = Gtk.Label(label="--", css_classes=["monospace"])
             inner.append(self.value_label)
@@ -153,14 +401,35 @@ class TopicWidget(Gtk.Box):
         self.ts_label = Gtk.Label(label="", css_classes=["dim-label", "caption"], xalign=1)
         inner.append(self.ts_label)
         self.append(inner)
-
-    def update(self, payload):
-        self.value_label.set_label(str(payload)[:500])
-        self.ts_label.set_label(datetime.now().strftime("%H:%M:%S"))
+        # Last texts shown, so repeated values don't trigger a relayout
+        self._last_value_text = None
+        self._last_ts_text = ""
+
+    def _use_cairo_sparkline(self, gl_sparkline):
+        """Replace a GL sparkline that could not render with the Cairo one."""
+        if gl_sparkline is not self.sparkline:
+            return False
+        sparkline = SparklineWidget(max_points=gl_sparkline.max_points)
+        sparkline._take_ring(gl_sparkline)
+        inner = gl_sparkline.get_parent()
+        inner.insert_child_after(sparkline, gl_sparkline)
+        inner.remove(gl_sparkline)
+        self.sparkline = sparkline
+        return False
+
+    def update(self, text, fval):
+        """Show a message; text is pre-truncated, fval its float value or None."""
+        if text != self._last_value_text:
+            self.value_label.set_label(text)
+            self._last_value_text = text
+        ts = _now_hms()
+        if ts is not self._last_ts_text:
+            self.ts_label.set_label(ts)
+            self._last_ts_text = ts
         if self.widget_type == "gauge":
-            self.gauge.set_value(payload)
+            self.gauge.set_value(fval)
         elif self.widget_type == "sparkline":
-            self.sparkline.add_value(payload)
+            self.sparkline.add_value(fval)
 
 
 class MqttDashboardWindow(Adw.ApplicationWindow):
@@ -168,6 +437,17 @@ class MqttDashboardWindow(Adw.ApplicationWindow):
         super().__init__(**kwargs, title=_("MQTT Dashboard"), default_width=1000, default_height=700)
         self.client = None
         self.topic_widgets = {}
+        # Exact topics are looked up directly; only wildcard patterns use the trie
+        self._exact_widgets = {}
+        self._topic_trie = {}
+        # Incoming messages are queued by the MQTT thread and drained in batches
+        self._pending = deque()
+        self._pending_lock = threading.Lock()
+        self._drain_scheduled = False
+        self._save_timer = None
+        # All outbound MQTT calls run on one worker so the UI never blocks on the broker
+        self._mqtt_tx = queue.Queue()
+        threading.Thread(target=self._mqtt_worker, daemon=True).start()
         self.config = self._load_config()
 
         header = Adw.HeaderBar()
@@ -236,6 +516,8 @@ class MqttDashboardWindow(Adw.ApplicationWindow):
         sw2 = Gtk.ScrolledWindow(min_content_height=120)
         self.log_view = Gtk.TextView(monospace=True, editable=False, wrap_mode=Gtk.WrapMode.WORD_CHAR)
         sw2.set_child(self.log_view)
+        log_buf = self.log_view.get_buffer()
+        self._log_end_mark = log_buf.create_mark("log-end", log_buf.get_end_iter(), False)
         log_expander.set_child(sw2)
 
         self.statusbar = Gtk.Label(label="", xalign=0, css_classes=["dim-label"], margin_start=12, margin_bottom=4)
@@ -254,7 +536,14 @@ class MqttDashboardWindow(Adw.ApplicationWindow):
         for sub in self.config.get("subscriptions", []):
             self._add_topic_widget(sub["topic"], sub.get("type", "text"))
 
-        GLib.timeout_add_seconds(1, self._update_status)
+        # The status clock only ticks while the window is shown and not
+        # suspended (minimized or fully occluded; GTK >= 4.12 only)
+        self._status_timer = None
+        if HAS_SUSPENDED:
+            self.connect("notify::suspended", self._sync_status_timer)
+        self.connect("notify::visible", self._sync_status_timer)
+        self._sync_status_timer()
+        self.connect("close-request", self._on_close_request)
 
     def _toggle_connection(self, _btn):
         if not HAS_MQTT:
@@ -262,8 +551,7 @@ class MqttDashboardWindow(Adw.ApplicationWindow):
             return
 
         if self.client:
-            self.client.disconnect()
-            self.client = None
+            self._queue_disconnect()
             self.connect_btn.set_label(_("Connect"))
             self.conn_status.set_label(_("Disconnected"))
             return
@@ -275,17 +563,48 @@ class MqttDashboardWindow(Adw.ApplicationWindow):
         self.client.on_message = self._on_message
         self.client.on_disconnect = self._on_disconnect
 
+        client = self.client
+
         def connect():
-            try:
-                self.client.connect(host, port, 60)
-                self.client.loop_start()
-            except Exception as e:
-                GLib.idle_add(self.conn_status.set_label, f"Error: {e}")
+            client.connect(host, port, 60)
+            client.loop_start()
 
-        threading.Thread(target=connect, daemon=True).start()
+        self._mqtt_tx.put((connect, ()))
         self.connect_btn.set_label(_("Disconnect"))
         self.conn_status.set_label(_("Connecting..."))
 
+    def _queue_disconnect(self):
+        client = self.client
+
+        def disconnect():
+            client.disconnect()
+            client.loop_stop()
+
+        # Queued so it runs after a connect that is still pending
+        self._mqtt_tx.put((disconnect, ()))
+        self.client = None
+
+    def _mqtt_worker(self):
+        """Run queued MQTT operations, draining up to MQTT_TX_BATCH per wakeup.
+
+        Returns once the None sentinel queued by _on_close_request is reached.
+        """
+        while True:
+            batch = [self._mqtt_tx.get()]
+            try:
+                while len(batch) < MQTT_TX_BATCH:
+                    batch.append(self._mqtt_tx.get_nowait())
+            except queue.Empty:
+                pass
+            for item in batch:
+                if item is None:
+                    return
+                op, args = item
+                try:
+                    op(*args)
+                except Exception as e:
+                    GLib.idle_add(self.conn_status.set_label, f"Error: {e}")
+
     def _on_connect(self, client, userdata, flags, rc):
         GLib.idle_add(self.conn_status.set_label, _("Connected"))
         # Re-subscribe to existing topics
@@ -301,35 +620,77 @@ class MqttDashboardWindow(Adw.ApplicationWindow):
             payload = msg.payload.decode('utf-8')
         except Exception:
             payload = str(msg.payload)
-        GLib.idle_add(self._handle_message, topic, payload)
-
-    def _handle_message(self, topic, payload):
-        # Update matching widgets (support wildcards by matching all)
-        for t, widget in self.topic_widgets.items():
-            if topic == t or self._topic_matches(t, topic):
-                widget.update(payload)
+        with self._pending_lock:
+            self._pending.append((topic, payload))
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        GLib.idle_add(self._drain_pending)
+
+    def _drain_pending(self):
+        """Handle all queued messages in a single main loop dispatch."""
+        with self._pending_lock:
+            batch = list(self._pending)
+            self._pending.clear()
+            self._drain_scheduled = False
+        ts = _now_hms()
+        lines = []
+        for topic, payload in batch:
+            self._handle_message(topic, payload)
+            lines.append(f"[{ts}] {topic}: {payload}\n")
 
         # Log
-        buf = self.log_view.get_buffer()
-        ts = datetime.now().strftime("%H:%M:%S")
-        buf.insert(buf.get_end_iter(), f"[{ts}] {topic}: {payload}\n")
+        if lines:
+            buf = self.log_view.get_buffer()
+            buf.insert(buf.get_iter_at_mark(self._log_end_mark), "".join(lines))
+            self._trim_log(buf)
+        return False
+
+    def _trim_log(self, buf):
+        """Drop the oldest lines so the log never grows past LOG_MAX_LINES."""
+        n = buf.get_line_count()
+        if n <= LOG_MAX_LINES:
+            return
+        _ok, end = buf.get_iter_at_line(n - LOG_KEEP_LINES)
+        buf.delete(buf.get_start_iter(), end)
 
-    def _topic_matches(self, pattern, topic):
-        """Simple MQTT wildcard matching."""
-        if pattern == "#":
-            return True
-        pp = pattern.split("/")
-        tp = topic.split("/")
-        for i, p in enumerate(pp):
-            if p == "#":
-                return True
-            if i >= len(tp):
-                return False
-            if p == "+":
-                continue
-            if p != tp[i]:
-                return False
-        return len(pp) == len(tp)
+    def _handle_message(self, topic, payload):
+        widgets = self._match_widgets(topic) if self._topic_trie else []
+        widget = self._exact_widgets.get(topic)
+        if widget is not None:
+            widgets.append(widget)
+        if not widgets:
+            return
+        # Convert once, then fan out to every matching widget
+        text = payload if len(payload) <= 500 else payload[:500]
+        try:
+            fval = float(payload)
+        except ValueError:
+            fval = None
+        for widget in widgets:
+            widget.update(text, fval)
+
+    def _match_widgets(self, topic):
+        """Collect widgets whose wildcard pattern matches topic."""
+        levels = _split_topic(topic)
+        found = []
+
+        def walk(node, i):
+            multi = node.get("#")
+            if multi is not None:
+                found.extend(multi.get(_TRIE_WIDGETS, ()))
+            if i == len(levels):
+                found.extend(node.get(_TRIE_WIDGETS, ()))
+                return
+            child = node.get(levels[i])
+            if child is not None:
+                walk(child, i + 1)
+            single = node.get("+")
+            if single is not None:
+                walk(single, i + 1)
+
+        walk(self._topic_trie, 0)
+        return found
 
     def _subscribe_topic(self, _btn):
         topic = self.sub_entry.get_text().strip()
@@ -339,13 +700,23 @@ class MqttDashboardWindow(Adw.ApplicationWindow):
         wtype = types[self.type_combo.get_selected()]
         self._add_topic_widget(topic, wtype)
         if self.client:
-            self.client.subscribe(topic)
+            self._mqtt_tx.put((self.client.subscribe, (topic,)))
 
     def _add_topic_widget(self, topic, wtype):
+        # Only subscription patterns are interned; interning every incoming
+        # topic would grow the (on 3.12+ immortal) intern table without bound
+        topic = sys.intern(topic)
         if topic in self.topic_widgets:
             return
         w = TopicWidget(topic, wtype)
         self.topic_widgets[topic] = w
+        if "+" in topic or "#" in topic:
+            node = self._topic_trie
+            for level in _split_topic(topic):
+                node = node.setdefault(level, {})
+            node.setdefault(_TRIE_WIDGETS, []).append(w)
+        else:
+            self._exact_widgets[topic] = w
         self.flow.append(w)
 
     def _publish(self, _btn):
@@ -354,7 +725,7 @@ class MqttDashboardWindow(Adw.ApplicationWindow):
         topic = self.pub_topic.get_text().strip()
         msg = self.pub_msg.get_text()
         if topic:
-            self.client.publish(topic, msg)
+            self._mqtt_tx.put((self.client.publish, (topic, msg)))
 
     def _save_config(self, _btn=None):
         self.config = {
@@ -365,16 +736,101 @@ class MqttDashboardWindow(Adw.ApplicationWindow):
                 for t, w in self.topic_widgets.items()
             ]
         }
+        if self._save_timer is not None:
+            GLib.source_remove(self._save_timer)
+        self._save_timer = GLib.timeout_add(SAVE_DELAY_MS, self._do_save_flush)
+
+    def _do_save_flush(self):
+        self._save_timer = None
+        config = copy.deepcopy(self.config)
+        future = _SAVE_EXECUTOR.submit(self._write_config, config, _json_dumps(config))
+        future.add_done_callback(self._on_config_written)
+        return False
+
+    def _on_config_written(self, future):
+        # Runs on the executor thread; hand results back to the main loop
+        try:
+            written = future.result()
+        except Exception as e:
+            print(f"Saving {CONFIG_FILE} failed: {e}", file=sys.stderr)
+            return
+        if written is not None:
+            GLib.idle_add(self._store_config_cache, *written)
+
+    def _on_close_request(self, _win):
+        self.flush_pending_save()
+        if self.client:
+            self._queue_disconnect()
+        # Stop the MQTT worker once everything queued before it has run
+        self._mqtt_tx.put(None)
+        return False
+
+    def flush_pending_save(self):
+        """Start a save that is still waiting for its debounce timer."""
+        if self._save_timer is not None:
+            GLib.source_remove(self._save_timer)
+            self._do_save_flush()
+
+    def _write_config(self, config, data):
+        """Write the config unless the file already holds exactly this data.
+
+        Runs on the save executor, so it only reads _CONFIG_CACHE and returns
+        (config, data, stat) for the main loop to cache, or None if skipped.
+        """
+        try:
+            st = os.stat(CONFIG_FILE)
+        except OSError:
+            st = None
+        if st is not None:
+            cached = _CONFIG_CACHE.get((CONFIG_FILE, st.st_mtime_ns, st.st_size))
+            if cached is not None and cached[1] == data:
+                return
         os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        # Write a sibling file and rename it over, so readers never see a torn file
+        tmp = CONFIG_FILE + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+            f.flush()
+            # The rename keeps this inode, mtime and size
+            st = os.fstat(f.fileno())
+        os.replace(tmp, CONFIG_FILE)
+        return config, data, st
 
     def _load_config(self):
         try:
-            with open(CONFIG_FILE) as f:
-                return json.load(f)
+            st = os.stat(CONFIG_FILE)
+        except OSError:
+            return {}
+        cached = _CONFIG_CACHE.get((CONFIG_FILE, st.st_mtime_ns, st.st_size))
+        if cached is not None:
+            return copy.deepcopy(cached[0])
+        try:
+            with open(CONFIG_FILE, 'rb') as f:
+                data = f.read()
+                # Key on the file actually read, not a later stat of the path
+                st = os.fstat(f.fileno())
+            config = _json_loads(data)
         except (FileNotFoundError, json.JSONDecodeError):
             return {}
+        self._store_config_cache(config, data, st)
+        return copy.deepcopy(config)
+
+    def _store_config_cache(self, config, data, st):
+        """Remember the parsed config under the given stat's key."""
+        for key in [k for k in _CONFIG_CACHE if k[0] == CONFIG_FILE]:
+            del _CONFIG_CACHE[key]
+        _CONFIG_CACHE[(CONFIG_FILE, st.st_mtime_ns, st.st_size)] = (config, data)
+        return False
+
+    def _sync_status_timer(self, *_args):
+        running = self._status_timer is not None
+        wanted = self.get_visible() and not (HAS_SUSPENDED and self.is_suspended())
+        if wanted and not running:
+            self._update_status()
+            self._status_timer = GLib.timeout_add_seconds(1, self._update_status)
+        elif running and not wanted:
+            GLib.source_remove(self._status_timer)
+            self._status_timer = None
 
     def _update_status(self):
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -428,6 +884,14 @@ class MqttDashboardApp(Adw.Application):
         self.add_action(quit_action)
         self.set_accels_for_action("app.quit", ["<Control>q"])
 
+    def do_shutdown(self):
+        # app.quit skips close-request, so flush debounced saves here too
+        for win in self.get_windows():
+            if isinstance(win, MqttDashboardWindow):
+                win.flush_pending_save()
+        _SAVE_EXECUTOR.shutdown(wait=True)
+        Adw.Application.do_shutdown(self)
+
 
 def main():
     app = MqttDashboardApp()